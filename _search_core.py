@@ -0,0 +1,221 @@
+"""
+Bitboard kernels used by ConnectFour and ConnectFourAI's search
+
+Positions are two ints (one per player) with columns stored bottom-up in
+ROWS+1 bits each; the extra bit is an always-empty sentinel that stops
+shifts from wrapping between columns. Cell (row, col) of the numpy board
+lives at bit col*H + (ROWS-1-row).
+
+The functions only use scalar int arithmetic so that numba can compile them
+to machine code; without numba they run as plain Python.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Board layout
+ROWS, COLS = 6, 7
+H = ROWS + 1
+BOTTOM_MASK = sum(1 << (c * H) for c in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+TOP_MASK = BOTTOM_MASK << (ROWS - 1)
+# Bit distance between neighbouring cells of a line: vertical, horizontal,
+# diagonal \ and diagonal /
+DIRS = (1, H, H - 1, H + 1)
+COLUMN_MASKS = tuple(((1 << ROWS) - 1) << (c * H) for c in range(COLS))
+CENTER_MASK = COLUMN_MASKS[3]
+LEFT_OF_CENTER_MASK = COLUMN_MASKS[2]
+RIGHT_OF_CENTER_MASK = COLUMN_MASKS[4]
+
+# Every four-in-a-row line as a mask (24 horizontal, 21 vertical, 24 diagonal)
+WIN_LINES = tuple(
+    sum(1 << ((c + i * dc) * H + r + i * dr) for i in range(4))
+    for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1))
+    for c in range(COLS - 3 * dc)
+    for r in range(max(0, -3 * dr), ROWS - max(0, 3 * dr))
+)
+
+# Bit of each cell of the numpy board
+CELL_BITS = np.array(
+    [[1 << (c * H + ROWS - 1 - r) for c in range(COLS)] for r in range(ROWS)],
+    dtype=np.uint64,
+)
+# Four-in-a-row lines through each cell, for checks around the last move
+CELL_LINES = [[[line for line in WIN_LINES if line >> (c * H + ROWS - 1 - r) & 1]
+               for c in range(COLS)] for r in range(ROWS)]
+
+
+def board_to_bitboards(board):
+    """Bitboards of players 1 and 2 on a numpy board"""
+    board = np.asarray(board)
+    return [int(CELL_BITS[board == p].sum()) for p in (1, 2)]
+
+# First cells of the windows scored by the heuristic
+H_STARTS = sum(COLUMN_MASKS[:COLS - 3])
+H5_STARTS = sum(COLUMN_MASKS[:COLS - 4])
+V_STARTS = BOTTOM_MASK * ((1 << (ROWS - 3)) - 1)
+
+# Four-cell window scores
+FOUR_SCORE = 1000000000     # Immediate win - highest priority
+THREE_SCORE = 50000000 * 2  # Potential win next move (gap always playable)
+BLOCK_SCORE = -900000000    # Must block opponent's win
+TWO_SCORE = 5000            # Building pattern
+
+# Integer weights of the horizontal-and-everything-else and vertical terms,
+# so vertical threats are slightly preferred without leaving int arithmetic
+HORIZ_W = 10
+VERT_W = 12
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def popcount(x):
+        n = 0
+        while x:
+            x &= x - 1
+            n += 1
+        return n
+else:
+    def popcount(x):
+        return x.bit_count()
+
+
+@njit(cache=True)
+def wins(bb):
+    """
+    Check a bitboard for four in a row with one shift/AND pair per
+    direction of DIRS, unrolled since this runs at every search node
+    """
+    # vertical
+    m = bb & (bb >> 1)
+    if m & (m >> 2):
+        return True
+    # horizontal
+    m = bb & (bb >> H)
+    if m & (m >> (2 * H)):
+        return True
+    # diagonal \
+    m = bb & (bb >> (H - 1))
+    if m & (m >> (2 * (H - 1))):
+        return True
+    # diagonal /
+    m = bb & (bb >> (H + 1))
+    if m & (m >> (2 * (H + 1))):
+        return True
+    return False
+
+
+@njit(cache=True)
+def playable(mask):
+    """Bits of the cells a piece can be dropped into next"""
+    return (mask + BOTTOM_MASK) & BOARD_MASK
+
+
+@njit(cache=True)
+def legal_cols(mask):
+    """Columns with room left, read off the empty top-row bits lowest first"""
+    free = TOP_MASK & ~mask
+    cols = []
+    while free:
+        low = free & -free
+        cols.append(popcount(low - 1) // H)
+        free ^= low
+    return cols
+
+
+@njit(cache=True)
+def winning_positions(bb, mask):
+    """Empty cells that would complete four in a row for `bb`"""
+    # Vertical: three stacked pieces directly below
+    r = (bb << 1) & (bb << 2) & (bb << 3)
+    for shift in DIRS[1:]:
+        p = (bb << shift) & (bb << (2 * shift))
+        r |= p & (bb << (3 * shift))
+        r |= p & (bb >> shift)
+        p = (bb >> shift) & (bb >> (2 * shift))
+        r |= p & (bb << shift)
+        r |= p & (bb >> (3 * shift))
+    return r & (BOARD_MASK ^ mask)
+
+
+@njit(cache=True)
+def winning_cols(bb, mask):
+    """Bitmask of the columns where dropping a piece next completes four for `bb`"""
+    cells = winning_positions(bb, mask) & playable(mask)
+    cols = 0
+    for c in range(COLS):
+        if cells & COLUMN_MASKS[c]:
+            cols |= 1 << c
+    return cols
+
+
+@njit(cache=True)
+def windows_score(own, other, empty, shift, starts):
+    """
+    Total window score of every four-cell window that begins on a bit of
+    `starts` and runs in the `shift` direction, classified for all windows
+    at once with shifted copies of the bitboards
+    """
+    o1, o2, o3 = own >> shift, own >> (2 * shift), own >> (3 * shift)
+    t1, t2, t3 = other >> shift, other >> (2 * shift), other >> (3 * shift)
+    e1, e2, e3 = empty >> shift, empty >> (2 * shift), empty >> (3 * shift)
+
+    fours = own & o1 & o2 & o3
+    threes = (empty & o1 & o2 & o3) | (own & e1 & o2 & o3) | \
+             (own & o1 & e2 & o3) | (own & o1 & o2 & e3)
+    blocks = (empty & t1 & t2 & t3) | (other & e1 & t2 & t3) | \
+             (other & t1 & e2 & t3) | (other & t1 & t2 & e3)
+    twos = (own & o1 & e2 & e3) | (own & e1 & o2 & e3) | (own & e1 & e2 & o3) | \
+           (empty & o1 & o2 & e3) | (empty & o1 & e2 & o3) | (empty & e1 & o2 & o3)
+
+    return (popcount(fours & starts) * FOUR_SCORE
+            + popcount(threes & starts) * THREE_SCORE
+            + popcount(blocks & starts) * BLOCK_SCORE
+            + popcount(twos & starts) * TWO_SCORE)
+
+
+@njit(cache=True)
+def evaluate(own, other):
+    """Heuristic score of the position for the owner of `own`"""
+    mask = own | other
+    empty = BOARD_MASK ^ mask
+
+    # Check for immediate threats first
+    total = -popcount(winning_positions(other, mask) & playable(mask)) * 1000000000
+
+    # Stronger center control preference
+    center = popcount(own & CENTER_MASK)
+    total += center * 8000
+
+    # Adjacent to center also more valuable
+    for col_mask in (LEFT_OF_CENTER_MASK, RIGHT_OF_CENTER_MASK):
+        count = popcount(own & col_mask)
+        total += count * 5000
+
+        # Extra bonus for controlling center and adjacent
+        if count > 0 and center > 0:
+            total += 3000
+
+    # Horizontal windows
+    total += windows_score(own, other, empty, H, H_STARTS)
+
+    # Check for trapped opponent pieces: five-cell rows holding two or more
+    ones = 0
+    twos = 0
+    for i in range(5):
+        t = other >> (i * H)
+        twos |= ones & t
+        ones |= t
+    total += popcount(twos & H5_STARTS) * 3000  # Bonus for trapping opponent
+
+    # Vertical windows
+    return total * HORIZ_W + windows_score(own, other, empty, 1, V_STARTS) * VERT_W
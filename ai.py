@@ -1,174 +1,184 @@
+import itertools
+import random
+import time
+from collections import OrderedDict
 import numpy as np
 from typing import Tuple, Optional
+from _search_core import (
+    H, BOARD_MASK, CELL_LINES, COLUMN_MASKS, FOUR_SCORE, THREE_SCORE, BLOCK_SCORE, TWO_SCORE, HORIZ_W,
+    board_to_bitboards, evaluate, legal_cols, playable, popcount, winning_cols,
+    winning_positions, wins,
+)
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Search scores are ints; INF is above any heuristic value and stands for a won game
+INF = 1 << 62
+BLUNDER_SCORE = -100000000 * HORIZ_W
 
 class ConnectFourAI:
     """
     AI player using minimax algorithm with alpha-beta pruning
     Includes heuristic evaluation of board positions
+
+    The search works on bitboards rather than the numpy board; the layout
+    and the hot kernels live in _search_core.
     """
     def __init__(self, game):
         self.game = game
         self.PLAYER = 1  # Human player
         self.AI = 2      # AI player
         self.MAX_DEPTH = 6 # Increased depth for better lookahead
+        self.TIME_LIMIT = None  # Optional seconds budget for iterative deepening
+
+        # Bitboard layout: cell (row, col) lives at bit col*H + (ROWS-1-row)
+        rows, cols = self.game.ROWS, self.game.COLS
+        self.H = H
+        # Static move order: center column outwards
+        self.COL_ORDER = sorted(range(cols), key=lambda c: abs(cols // 2 - c))
+        # Diagonal windows scored by _evaluate_future_threats
+        self.DIAG_WINDOWS = [sum(1 << ((c + i) * self.H + rows - 1 - (r + i)) for i in range(4))
+                             for r in range(rows - 3) for c in range(cols - 3)]
+
+        # Search state: bitboards indexed by player number (slot 0 unused)
+        # and the next free bit of each column
+        self._bb = [0, 0, 0]
+        self._heights = [c * self.H for c in range(cols)]
+
+        # Zobrist keys per bit index and player, plus one for the side to move
+        self.zobrist = [[random.getrandbits(64) for _ in range(3)]
+                        for _ in range(cols * self.H)]
+        self.zobrist_ai_to_move = random.getrandbits(64)
+        self._hash = 0
+
+        # Transposition table: hash -> (depth, value, flag, best_move),
+        # kept across turns and capped in LRU order
+        self.tt: OrderedDict = OrderedDict()
+        self.TT_SIZE = 1 << 17
+
+        # Two killer moves per remaining depth: recent causes of a cutoff
+        self.killers: list = [[-1, -1] for _ in range(self.MAX_DEPTH + 1)]
+
+        # Window scores per player, looked up by the base-3 code
+        # w[0]*27 + w[1]*9 + w[2]*3 + w[3] of the four cells
+        self.WIN_SCORES = {1: {}, 2: {}}
+        self.SIMPLE_WIN_SCORES = {1: {}, 2: {}}
+        for window in itertools.product((0, 1, 2), repeat=4):
+            key = window[0] * 27 + window[1] * 9 + window[2] * 3 + window[3]
+            for player in (1, 2):
+                counts = (window.count(player), window.count(3 - player), window.count(0))
+                self.WIN_SCORES[player][key] = self._window_value(*counts)
+                self.SIMPLE_WIN_SCORES[player][key] = self._simple_window_value(*counts)
     
     def set_player_number(self, player_num: int):
         """
         Set whether AI is player 1 or 2
         """
+        if player_num != self.AI:
+            # Stored values are from the AI's point of view
+            self.tt.clear()
         self.AI = player_num
-        self.PLAYER = 1 if player_num == 2 else 2
+        self.PLAYER = player_num ^ 3
+
+    def reset(self, game) -> None:
+        """
+        Play a new game without rebuilding the lookup tables; the
+        transposition table is kept, its entries stay valid across games
+        """
+        self.game = game
+        self.killers = [[-1, -1] for _ in range(self.MAX_DEPTH + 1)]
     
     def evaluate_window(self, window: list, player: int) -> int:
         """
         Enhanced window evaluation with better win detection
         """
-        score = 0
-        opponent = self.PLAYER if player == self.AI else self.AI
-        
+        w = window
+        return self.WIN_SCORES[player][w[0] * 27 + w[1] * 9 + w[2] * 3 + w[3]]
+
+    def _window_value(self, own: int, other: int, empty: int) -> int:
+        """Score a four-cell window from the counts of its cells"""
         # Winning patterns
-        if window.count(player) == 4:
-            score += 1000000000  # Immediate win - highest priority
-        elif window.count(player) == 3 and window.count(0) == 1:
-            score += 50000000   # Potential win next move
-            # Check if the empty spot is accessible
-            empty_index = window.index(0)
-            if self._is_accessible_in_window(window, empty_index):
-                score *= 2  # Double score for immediately playable wins
-        elif window.count(opponent) == 3 and window.count(0) == 1:
-            score -= 900000000  # Must block opponent's win
-        
+        if own == 4:
+            return FOUR_SCORE
+        if own == 3 and empty == 1:
+            return THREE_SCORE
+        if other == 3 and empty == 1:
+            return BLOCK_SCORE
         # Building patterns
-        elif window.count(player) == 2 and window.count(0) == 2:
-            score += 5000
-            # Check if both empty spots are accessible
-            if all(self._is_accessible_in_window(window, i) for i, val in enumerate(window) if val == 0):
-                score *= 2  # Double score for immediately playable threats
-                
-        return score
-    
-    def _is_accessible_in_window(self, window: list, pos: int) -> bool:
-        """Check if a position in a window is playable (all spaces below are filled)"""
-        return all(i == pos or window[i] != 0 for i in range(pos + 1, len(window)))
-    
+        if own == 2 and empty == 2:
+            return TWO_SCORE
+        return 0
+
     def score_position(self, board: np.ndarray, player: int) -> int:
         """
         Enhanced position evaluation with stronger center preference
         """
-        score = 0
         opponent = self.PLAYER if player == self.AI else self.AI
+        bb = self._to_bitboards(board)
+        return evaluate(bb[player], bb[opponent])
 
-        # Check for immediate threats first
-        for col in range(self.game.COLS):
-            row = self.get_next_row(board, col)
-            if row is not None:
-                board_copy = board.copy()
-                board_copy[row][col] = opponent
-                if self.is_winning_move(board_copy, row, col, opponent):
-                    score -= 1000000000
-
-        # Stronger center control preference
-        center_array = [int(i) for i in list(board[:, 3])]
-        score += center_array.count(player) * 8000  # Increased from 6000
-
-        # Adjacent to center also more valuable
-        for col in [2, 4]:
-            col_array = [int(i) for i in list(board[:, col])]
-            score += col_array.count(player) * 5000  # Increased from 4000
-            
-            # Extra bonus for controlling center and adjacent
-            if col_array.count(player) > 0 and center_array.count(player) > 0:
-                score += 3000
-
-        # Evaluate all possible windows
-        for row in range(self.game.ROWS):
-            for col in range(self.game.COLS-3):
-                # Horizontal windows
-                window = list(board[row, col:col+4])
-                score += self.evaluate_window(window, player)
-
-                # Check for trapped opponent pieces
-                if col < self.game.COLS-4:
-                    extended_window = list(board[row, col:col+5])
-                    if extended_window.count(opponent) >= 2:
-                        score += 3000  # Bonus for trapping opponent
-
-        # Vertical windows
-        for col in range(self.game.COLS):
-            col_array = [int(i) for i in list(board[:,col])]
-            for row in range(self.game.ROWS-3):
-                window = col_array[row:row+4]
-                score += self.evaluate_window(window, player) * 1.2  # Slightly prefer vertical threats
-
-        return score
-        
     def _evaluate_immediate_threats(self, board: np.ndarray, player: int, opponent: int) -> int:
+        """Score immediate wins and threats on the board"""
         score = 0
+        bb = self._to_bitboards(board)
+        mask = bb[1] | bb[2]
+        own_wins = winning_positions(bb[player], mask)
+        other_wins = winning_positions(bb[opponent], mask)
         
         # Check for winning moves and immediate threats
-        for col in range(self.game.COLS):
-            row = self.get_next_row(board, col)
-            if row is not None:
-                # Check if we can win
-                board_copy = board.copy()
-                board_copy[row][col] = player
-                if self.is_winning_move(board_copy, row, col, player):
-                    score += 1000000000
-                
-                # Check if opponent can win
-                board_copy = board.copy()
-                board_copy[row][col] = opponent
-                if self.is_winning_move(board_copy, row, col, opponent):
-                    score -= 500000000
+        drops = playable(mask)
+        for col in legal_cols(mask):
+            bit = drops & COLUMN_MASKS[col]
+            # Check if we can win
+            if own_wins & bit:
+                score += 1000000000
+            
+            # Check if opponent can win
+            if other_wins & bit:
+                score -= 500000000
                     
         return score
         
     def _evaluate_future_threats(self, board: np.ndarray, player: int, opponent: int) -> int:
+        """Score two-move win setups on the board"""
         score = 0
+        bb = self._to_bitboards(board)
+        own = bb[player]
+        mask = bb[1] | bb[2]
+        playable_cells = playable(mask)
         
         # Look for two-move win setups
-        for col in range(self.game.COLS):
-            row = self.get_next_row(board, col)
-            if row is not None:
-                # Try our first move
-                board_copy = board.copy()
-                board_copy[row][col] = player
-                
-                # Check if this creates a fork (two winning moves)
-                winning_moves = 0
-                for col2 in range(self.game.COLS):
-                    row2 = self.get_next_row(board_copy, col2)
-                    if row2 is not None:
-                        board_copy2 = board_copy.copy()
-                        board_copy2[row2][col2] = player
-                        if self.is_winning_move(board_copy2, row2, col2, player):
-                            winning_moves += 1
-                
-                if winning_moves >= 2:  # Found a fork
-                    score += 100000
+        for col in legal_cols(mask):
+            # Try our first move
+            bit = playable_cells & COLUMN_MASKS[col]
+            
+            # Check if this creates a fork (two winning moves)
+            if popcount(winning_cols(own | bit, mask | bit)) >= 2:  # Found a fork
+                score += 100000
                     
         # Look for diagonal threats
-        for row in range(self.game.ROWS-3):
-            for col in range(self.game.COLS-3):
-                window = [board[row+i][col+i] for i in range(4)]
-                if window.count(player) == 2 and window.count(0) == 2:
-                    # Check if both empty spaces are accessible
-                    empty_positions = [(row+i, col+i) for i in range(4) if window[i] == 0]
-                    if all(self._is_accessible(board, r, c) for r, c in empty_positions):
-                        score += 5000
+        empty = BOARD_MASK ^ mask
+        for w in self.DIAG_WINDOWS:
+            if popcount(own & w) == 2 and popcount(empty & w) == 2:
+                # Check if both empty spaces are accessible
+                if not (empty & w) & ~playable_cells:
+                    score += 5000
                         
         return score
         
     def _evaluate_position_control(self, board: np.ndarray, player: int, opponent: int) -> int:
         score = 0
+        # Convert once; everything below indexes plain Python ints
+        cells = board.tolist()
         
         # Center column control (most important)
-        center_array = [int(i) for i in list(board[:, 3])]
+        center_array = [row[3] for row in cells]
         score += center_array.count(player) * 8000
         
         # Control of columns adjacent to center
         for col in [2, 4]:
-            col_array = [int(i) for i in list(board[:, col])]
+            col_array = [row[col] for row in cells]
             score += col_array.count(player) * 6000
             
             # Detect developing threats
@@ -178,221 +188,287 @@ class ConnectFourAI:
         # Progressive row weighting (bottom rows worth more)
         for row in range(self.game.ROWS):
             row_weight = (self.game.ROWS - row) * 300
-            row_array = [int(i) for i in list(board[row,:])]
+            row_array = cells[row]
             
             # Look for connected pieces
             for col in range(self.game.COLS-1):
-                if board[row][col] == player and board[row][col+1] == player:
+                if row_array[col] == player and row_array[col+1] == player:
                     score += 1000 * row_weight
                     
         return score
         
-    def _is_accessible(self, board: np.ndarray, row: int, col: int) -> bool:
-        """Check if a position can be played (all spaces below are filled)"""
-        return all(board[r][col] != 0 for r in range(self.game.ROWS-1, row, -1))
-    
+    def _to_bitboards(self, board: np.ndarray) -> list:
+        """Convert a numpy board into bitboards indexed by player number"""
+        return [0] + board_to_bitboards(board)
+
+    def _load_game(self) -> None:
+        """Set the search state from the game's bitboards"""
+        self._load_bitboards([0] + self.game.bb)
+
+    def _load_bitboards(self, bb: list) -> None:
+        """Set the search state from bitboards indexed by player number"""
+        mask = bb[1] | bb[2]
+        self._bb = bb
+        self._heights = [c * self.H + popcount(mask & COLUMN_MASKS[c])
+                         for c in range(self.game.COLS)]
+        self._hash = 0
+        for bit in range(self.game.COLS * self.H):
+            for p in (1, 2):
+                if self._bb[p] >> bit & 1:
+                    self._hash ^= self.zobrist[bit][p]
+
+    def _store_killer(self, depth: int, col: int) -> None:
+        """Remember a move that caused a cutoff at this depth"""
+        killers = self.killers[depth]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+
+    def _tt_store(self, key: int, depth: int, value: int, flag: int,
+                  best_move: Optional[int]) -> None:
+        """Store a search result, keeping a deeper entry for the same position"""
+        entry = self.tt.get(key)
+        if entry is not None and entry[0] > depth:
+            return
+        self.tt[key] = (depth, value, flag, best_move)
+        self.tt.move_to_end(key)
+        if len(self.tt) > self.TT_SIZE:
+            self.tt.popitem(last=False)
+
+    def _make(self, col: int, player: int) -> None:
+        """Drop a piece into the search position, updating the hash"""
+        h = self._heights[col]
+        self._bb[player] ^= 1 << h
+        self._hash ^= self.zobrist[h][player]
+        self._heights[col] = h + 1
+
+    def _unmake(self, col: int, player: int) -> None:
+        """Take back the last piece `player` dropped into `col`"""
+        h = self._heights[col] - 1
+        self._heights[col] = h
+        self._bb[player] ^= 1 << h
+        self._hash ^= self.zobrist[h][player]
+
     def get_next_row(self, board: np.ndarray, col: int) -> Optional[int]:
         """Helper method to find next available row"""
         for row in range(self.game.ROWS-1, -1, -1):
-            if board[row][col] == 0:
+            if board[row, col] == 0:
                 return row
         return None
     
     def allows_opponent_win(self, board: np.ndarray, opponent: int) -> bool:
         """Check if current position allows opponent to win next move"""
-        for col in range(self.game.COLS):
-            row = self.get_next_row(board, col)
-            if row is not None:
-                board_copy = board.copy()
-                board_copy[row][col] = opponent
-                if self.is_winning_move(board_copy, row, col, opponent):
-                    return True
-        return False
+        bb = self._to_bitboards(board)
+        mask = bb[1] | bb[2]
+        return bool(winning_positions(bb[opponent], mask) & playable(mask))
     
     def is_winning_move(self, board: np.ndarray, row: int, col: int, player: int) -> bool:
         """Check if a move is winning"""
-        # Check horizontal
-        for c in range(max(0, col-3), min(col+1, self.game.COLS-3)):
-            if all(board[row][c+i] == player for i in range(4)):
-                return True
-                
-        # Check vertical
-        if row <= self.game.ROWS-4:
-            if all(board[row+i][col] == player for i in range(4)):
-                return True
-                
-        # Check positive diagonal
-        for i in range(-3, 1):
-            r, c = row-i, col-i
-            if (0 <= r <= self.game.ROWS-4 and 0 <= c <= self.game.COLS-4 and
-                all(board[r+j][c+j] == player for j in range(4))):
-                return True
-                
-        # Check negative diagonal
-        for i in range(-3, 1):
-            r, c = row+i, col-i
-            if (3 <= r < self.game.ROWS and 0 <= c <= self.game.COLS-4 and
-                all(board[r-j][c+j] == player for j in range(4))):
-                return True
-                
-        return False
-    def minimax(self, board: np.ndarray, depth: int, alpha: float, beta: float,
-            maximizing: bool) -> Tuple[Optional[int], float]:
+        # Test every line through the cell against the player's pieces
+        bb = self._to_bitboards(board)[player]
+        return any((bb & line) == line for line in CELL_LINES[row][col])
 
-        valid_locations = self.get_valid_locations(board)
-    
-        # terminal / depth base cases using the simulated board
-        if depth == 0 or self.is_terminal_node(board):
-            if self.winning_move_board(board, self.AI):
-                return (None, float('inf'))
-            if self.winning_move_board(board, self.PLAYER):
-                return (None, float('-inf'))
-            return (None, float(self.score_position(board, self.AI)))
-    
-        # simple move-ordering: center first to improve pruning
-        center = self.game.COLS // 2
-        valid_locations.sort(key=lambda c: abs(center - c))
-    
-        if maximizing:  # AI to move
-            value = float('-inf')
-            best_col = valid_locations[0]
-            for col in valid_locations:
-                row = self.get_next_row(board, col)
-                if row is None:
-                    continue
-                b2 = board.copy()
-                b2[row, col] = self.AI
+    def minimax(self, board: np.ndarray, depth: int, alpha: int, beta: int,
+            maximizing: bool, pv_move: Optional[int] = None) -> Tuple[Optional[int], int]:
+        """
+        Search the board and return the best column with its value from the
+        AI's point of view; `maximizing` is True when the AI is to move
+        """
+        self._load_bitboards(self._to_bitboards(board))
+        if len(self.killers) <= depth:
+            self.killers = [[-1, -1] for _ in range(depth + 1)]
+        if maximizing:
+            return self._negamax(depth, alpha, beta, 1, pv_move)
+        col, value = self._negamax(depth, -beta, -alpha, -1, pv_move)
+        return col, -value
+
+    def _negamax(self, depth: int, alpha: int, beta: int, color: int,
+                 pv_move: Optional[int] = None) -> Tuple[Optional[int], int]:
+        """
+        Principal variation search (negamax form of alpha-beta): values are
+        from the point of view of the side to move, `color` being 1 when that
+        is the AI and -1 for the human. The first move gets the full window and
+        the rest a null window, re-searched only when they fail high.
+        Moves are played and taken back in place instead of copying boards.
+        Results are cached in self.tt keyed by the Zobrist hash.
+        `pv_move` is searched first when the table has no move for the node.
+        """
+        # bind what every node reads to locals once
+        bb = self._bb
+        heights = self._heights
+        AI, PLAYER = self.AI, self.PLAYER
+        mask = bb[1] | bb[2]
+
+        # terminal / depth base cases using the search position
+        if wins(bb[AI]):
+            return (None, color * INF)
+        if wins(bb[PLAYER]):
+            return (None, -color * INF)
+        if depth == 0:
+            return self._quiesce(color)
+        if mask == BOARD_MASK:  # board full
+            return (None, color * evaluate(bb[AI], bb[PLAYER]))
     
-                # avoid blunders that give the opponent an immediate win
-                if self.allows_opponent_win(b2, self.PLAYER):
-                    score = -1e8
+        # probe the transposition table before expanding
+        key = self._hash ^ (self.zobrist_ai_to_move if color == 1 else 0)
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        entry = self.tt.get(key)
+        if entry is not None:
+            self.tt.move_to_end(key)
+            tt_depth, tt_value, tt_flag, tt_move = entry
+            if tt_depth >= depth:
+                if tt_flag == EXACT:
+                    return tt_move, tt_value
+                if tt_flag == LOWER:
+                    alpha = max(alpha, tt_value)
                 else:
-                    score = self.minimax(b2, depth - 1, alpha, beta, False)[1]
-    
-                if score > value:
-                    value, best_col = score, col
-                alpha = max(alpha, value)
+                    beta = min(beta, tt_value)
                 if alpha >= beta:
-                    break
-            return best_col, value
-    
-        else:  # human to move
-            value = float('inf')
-            best_col = valid_locations[0]
-            for col in valid_locations:
-                row = self.get_next_row(board, col)
-                if row is None:
-                    continue
-                b2 = board.copy()
-                b2[row, col] = self.PLAYER
-    
-                if self.allows_opponent_win(b2, self.AI):
-                    score = 1e8
-                else:
-                    score = self.minimax(b2, depth - 1, alpha, beta, True)[1]
-    
-                if score < value:
-                    value, best_col = score, col
-                beta = min(beta, value)
-                if alpha >= beta:
-                    break
-            return best_col, value
+                    return tt_move, tt_value
+
+        # move ordering: best move from an earlier search, then killer
+        # moves for this depth, then center-out
+        if tt_move is None:
+            tt_move = pv_move
+        killers = self.killers[depth]
+        top = self.game.ROWS
+        valid_locations = [c for c in self.COL_ORDER if heights[c] - c * H < top]
+        valid_locations.sort(key=lambda c: 0 if c == tt_move else 1 if c in killers else 2)
+
+        me, opponent = (AI, PLAYER) if color == 1 else (PLAYER, AI)
+
+        # winning on the spot beats any block
+        wins_now = winning_cols(bb[me], mask)
+        if wins_now:
+            return (wins_now.bit_length() - 1, INF)
+
+        # when the opponent threatens to win only the blocking moves matter
+        threats = winning_cols(bb[opponent], mask)
+        if threats:
+            valid_locations = [c for c in valid_locations if threats >> c & 1]
+        value = -INF
+        best_col = valid_locations[0]
+        full_window = True
+        negamax, make, unmake = self._negamax, self._make, self._unmake
+        for col in valid_locations:
+            make(col, me)
+
+            # avoid blunders that give the opponent an immediate win
+            after = mask | bb[me]
+            if winning_positions(bb[opponent], after) & playable(after):
+                score = BLUNDER_SCORE
+            elif full_window:
+                score = -negamax(depth - 1, -beta, -alpha, -color)[1]
+                full_window = False
+            else:
+                score = -negamax(depth - 1, -alpha - 1, -alpha, -color)[1]
+                if alpha < score < beta:
+                    score = -negamax(depth - 1, -beta, -score, -color)[1]
+
+            unmake(col, me)
+
+            if score > value:
+                value, best_col = score, col
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                self._store_killer(depth, col)
+                break
+
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._tt_store(key, depth, value, flag, best_col)
+        return best_col, value
+
+
+    def _quiesce(self, color: int) -> Tuple[Optional[int], int]:
+        """
+        Leaf value for the side to move, extended by one ply when either side
+        has an immediate winning column so a threat just past the horizon is
+        not scored as a quiet position
+        """
+        bb = self._bb
+        me, opponent = (self.AI, self.PLAYER) if color == 1 else (self.PLAYER, self.AI)
+        mask = bb[1] | bb[2]
+
+        if winning_cols(bb[me], mask):
+            return (None, INF)
+        threats = winning_cols(bb[opponent], mask)
+        if popcount(threats) >= 2:  # can only block one of them
+            return (None, -INF)
+        if threats:
+            col = threats.bit_length() - 1
+            self._make(col, me)
+            value = color * evaluate(bb[self.AI], bb[self.PLAYER])
+            self._unmake(col, me)
+            return (col, value)
+        return (None, color * evaluate(bb[self.AI], bb[self.PLAYER]))
 
-    
     def get_best_move(self) -> int:
         """
         Get best move with enhanced win detection
         """
-        # First check for immediate winning moves
-        for col in range(self.game.COLS):
-            row = self.get_next_row(self.game.board, col)
-            if row is not None:
-                board_copy = self.game.board.copy()
-                board_copy[row][col] = self.AI
-                if self.is_winning_move(board_copy, row, col, self.AI):
-                    return col  # Take winning move immediately
-
-        # Then check for opponent's winning moves to block
-        for col in range(self.game.COLS):
-            row = self.get_next_row(self.game.board, col)
-            if row is not None:
-                board_copy = self.game.board.copy()
-                board_copy[row][col] = self.PLAYER
-                if self.is_winning_move(board_copy, row, col, self.PLAYER):
-                    return col  # Block opponent's win
-
-        # Look for forced wins (winning moves after current move)
-        for col in range(self.game.COLS):
-            row = self.get_next_row(self.game.board, col)
-            if row is not None:
-                board_copy = self.game.board.copy()
-                board_copy[row][col] = self.AI
-                # Check if this move creates a guaranteed win next turn
-                winning_moves = 0
-                for next_col in range(self.game.COLS):
-                    next_row = self.get_next_row(board_copy, next_col)
-                    if next_row is not None:
-                        next_board = board_copy.copy()
-                        next_board[next_row][next_col] = self.AI
-                        if self.is_winning_move(next_board, next_row, next_col, self.AI):
-                            winning_moves += 1
-                if winning_moves >= 2:  # Found a forcing move
-                    return col
-
-        # Use minimax for other moves
-        col, _ = self.minimax(self.game.board, self.MAX_DEPTH, float('-inf'), 
-                            float('inf'), True)
+        # The search always opens in the center column, so skip it
+        if self.is_empty_board():
+            return self.game.COLS // 2
+
+        self._load_game()
+        bb = self._bb
+
+        # Take an immediate win without searching; blocks and forks are
+        # found by the search itself
+        win_cols = winning_cols(bb[self.AI], bb[1] | bb[2])
+        if win_cols:
+            return win_cols.bit_length() - 1
+
+        # Use minimax for other moves, deepening one ply at a time so each
+        # iteration's best move is searched first in the next
+        start = time.time()
+        col = None
+        self.killers = [[-1, -1] for _ in range(self.MAX_DEPTH + 1)]
+        for depth in range(1, self.MAX_DEPTH + 1):
+            col, _ = self._negamax(depth, -INF, INF, 1, col)
+            if self.TIME_LIMIT is not None and time.time() - start >= self.TIME_LIMIT:
+                break
         return col
 
     def is_empty_board(self) -> bool:
         """Check if the board is empty"""
-        return np.all(self.game.board == 0)
+        return not (self.game.bb[0] | self.game.bb[1])
 
     def _evaluate_window(self, window: list, player: int) -> int:
-        opponent = self.PLAYER if player == self.AI else self.AI
+        w = window
+        return self.SIMPLE_WIN_SCORES[player][w[0] * 27 + w[1] * 9 + w[2] * 3 + w[3]]
+
+    def _simple_window_value(self, own: int, other: int, empty: int) -> int:
         score = 0
 
-        if window.count(player) == 4:
+        if own == 4:
             score += 100000
-        elif window.count(player) == 3 and window.count(0) == 1:
+        elif own == 3 and empty == 1:
             score += 5000
-        elif window.count(player) == 2 and window.count(0) == 2:
+        elif own == 2 and empty == 2:
             score += 500
         
-        if window.count(opponent) == 3 and window.count(0) == 1:
+        if other == 3 and empty == 1:
             score -= 80000  # Increased penalty for opponent's threats
 
         return score
+
     def get_valid_locations(self, board: np.ndarray):
         return [c for c in range(self.game.COLS) if board[0, c] == 0]
     
     def winning_move_board(self, board: np.ndarray, player: int) -> bool:
-        R, C = self.game.ROWS, self.game.COLS
-        # horizontal
-        for r in range(R):
-            for c in range(C - 3):
-                if np.all(board[r, c:c+4] == player):
-                    return True
-        # vertical
-        for r in range(R - 3):
-            for c in range(C):
-                if np.all(board[r:r+4, c] == player):
-                    return True
-        # diag down-right
-        for r in range(R - 3):
-            for c in range(C - 3):
-                if all(board[r+i, c+i] == player for i in range(4)):
-                    return True
-        # diag up-right
-        for r in range(3, R):
-            for c in range(C - 3):
-                if all(board[r-i, c+i] == player for i in range(4)):
-                    return True
-        return False
+        return wins(self._to_bitboards(board)[player])
     
     def is_terminal_node(self, board: np.ndarray) -> bool:
+        bb = self._to_bitboards(board)
         return (
-            self.winning_move_board(board, self.AI)
-            or self.winning_move_board(board, self.PLAYER)
-            or len(self.get_valid_locations(board)) == 0
+            wins(bb[self.AI])
+            or wins(bb[self.PLAYER])
+            or (bb[1] | bb[2]) == BOARD_MASK
         )
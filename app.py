@@ -1,5 +1,5 @@
 # app.py — Streamlit UI with tkinter-like board + falling animation
-import time
+import numpy as np
 import streamlit as st
 from game import ConnectFour
 from ai import ConnectFourAI
@@ -17,6 +17,7 @@ BG = "#e5e7eb"
 CELL = 86                   # px for each cell
 PADDING = 14                # padding inside each cell for hole
 STROKE = 3
+DROP_SECONDS = 0.3          # duration of the falling animation
 
 st.markdown("""
     <style>
@@ -26,94 +27,172 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ------------------- HELPERS -------------------
-def render_svg(board, falling=None):
-    """
-    Draw the board as an SVG like tkinter:
-    - blue rectangle with circular holes (white)
-    - tokens with black stroke
-    - optional falling=(row, col, player) draws a token overlay
-    """
-    rows = len(board)
-    cols = len(board[0]) if rows else 0
-    width = cols * CELL
-    height = rows * CELL
+ROWS, COLS = ConnectFour.ROWS, ConnectFour.COLS
+RADIUS = (CELL // 2) - PADDING
+
+
+def hole_cx(c): return c * CELL + CELL // 2
+def hole_cy(r): return r * CELL + CELL // 2
+
+
+def disc_path(r, c, cell=CELL, radius=RADIUS):
+    """Path commands for one hole or token disc, drawn as two half arcs"""
+    cx, cy = c * cell + cell // 2, r * cell + cell // 2
+    return (f'M{cx - radius},{cy}'
+            f'a{radius},{radius} 0 1,0 {2 * radius},0'
+            f'a{radius},{radius} 0 1,0 {-2 * radius},0')
+
+
+TOKEN_COLORS = {1: RED, 2: YELLOW}
+
+# The board and its holes look the same every frame, so build them once per
+# process: Streamlit re-executes this module on every rerun, so plain module
+# constants would be rebuilt each time.
+# Everything after the rect sits in one <g> carrying the shared stroke, and
+# discs of one color are merged into a single <path>.
+# No xmlns: the SVG is inlined into HTML, not served as a document.
+# Every value the SVG depends on is an argument, so it is part of the cache key.
+@st.cache_data
+def _svg_templates(rows, cols, cell, radius, stroke, bg, board_color, edge_color, hole_color):
+    """Empty board SVG prefix and the disc path of every cell"""
+    width, height = cols * cell, rows * cell
+    # Disc path for every cell, so rendering only looks them up
+    cell_discs = [[disc_path(r, c, cell, radius) for c in range(cols)] for r in range(rows)]
+    prefix = (
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+        f'style="background:{bg};">'
+        # Board background
+        f'<rect width="{width}" height="{height}" fill="{board_color}"/>'
+        f'<g stroke="{edge_color}" stroke-width="{stroke}">'
+        # Holes (drawn as white discs to simulate cut-outs)
+        f'<path fill="{hole_color}" d="'
+        + "".join(d for row in cell_discs for d in row)
+        + '"/>'
+    )
+    return prefix, cell_discs
 
-    def hole_cx(c): return c * CELL + CELL // 2
-    def hole_cy(r): return r * CELL + CELL // 2
-    radius = (CELL // 2) - PADDING
 
-    # Start SVG
-    parts = [
-        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
-        f'xmlns="http://www.w3.org/2000/svg" style="background:{BG};">'
-    ]
+EMPTY_BOARD_SVG_PREFIX, CELL_DISC = _svg_templates(
+    ROWS, COLS, CELL, RADIUS, STROKE, BG, BOARD_BLUE, EDGE_COLOR, HOLE_COLOR)
+EMPTY_BOARD_SVG_SUFFIX = '</g></svg>'
 
-    # Board background
-    parts.append(
-        f'<rect x="0" y="0" width="{width}" height="{height}" fill="{BOARD_BLUE}" />'
+
+def falling_circle(row, col, player, begin=0.0):
+    """
+    Token that animates from the top row down to `row` in the browser,
+    starting `begin` seconds after the SVG is shown; it waits above the
+    board until then
+    """
+    return (
+        f'<circle cx="{hole_cx(col)}" cy="{-CELL}" r="{RADIUS}" fill="{TOKEN_COLORS[player]}">'
+        f'<animate attributeName="cy" from="{hole_cy(0)}" to="{hole_cy(row)}" '
+        f'begin="{begin}s" dur="{DROP_SECONDS}s" fill="freeze"/></circle>'
     )
 
-    # Holes (drawn as white circles to simulate cut-outs)
-    for r in range(rows):
-        for c in range(cols):
-            parts.append(
-                f'<circle cx="{hole_cx(c)}" cy="{hole_cy(r)}" r="{radius}" '
-                f'fill="{HOLE_COLOR}" stroke="{EDGE_COLOR}" stroke-width="{STROKE}" />'
-            )
-
-    # Tokens
-    for r in range(rows):
-        for c in range(cols):
+
+def token_discs(board, skip=()):
+    """
+    SVG for the tokens on the board, one <path> per color, leaving out
+    the (row, col) cells in `skip`
+    """
+    # Plain list indexing is much cheaper than ndarray scalar lookups
+    board = board.tolist() if hasattr(board, "tolist") else board
+    groups = {1: [], 2: []}
+    for r in range(ROWS):
+        for c in range(COLS):
             v = board[r][c]
-            if v == 0:
+            if v == 0 or (r, c) in skip:
                 continue
-            fill = RED if v == 1 else YELLOW
-            parts.append(
-                f'<circle cx="{hole_cx(c)}" cy="{hole_cy(r)}" r="{radius}" '
-                f'fill="{fill}" stroke="{EDGE_COLOR}" stroke-width="{STROKE}" />'
-            )
+            groups[v].append(CELL_DISC[r][c])
+    return "".join(
+        f'<path fill="{TOKEN_COLORS[p]}" d="{"".join(discs)}"/>'
+        for p, discs in groups.items() if discs
+    )
 
-    # Falling overlay (drawn last so it appears on top)
-    if falling is not None:
-        fr, fc, p = falling
-        fill = RED if p == 1 else YELLOW
-        parts.append(
-            f'<circle cx="{hole_cx(fc)}" cy="{hole_cy(fr)}" r="{radius}" '
-            f'fill="{fill}" stroke="{EDGE_COLOR}" stroke-width="{STROKE}" />'
-        )
 
-    parts.append('</svg>')
-    return "".join(parts)
+def _render_static(board, skip=()):
+    """Board, holes and committed tokens, without the closing </svg>"""
+    return EMPTY_BOARD_SVG_PREFIX + token_discs(board, skip)
 
 
-def next_empty_row(board, col):
-    """Return the row index where a token would land in this column, or None if full."""
-    for r in range(len(board) - 1, -1, -1):
-        if board[r][col] == 0:
-            return r
-    return None
+def _render_falling(static_prefix, falling):
+    """Close a static prefix with tokens dropping one after another"""
+    # Falling overlay (drawn last so it appears on top)
+    return (static_prefix
+            + "".join(falling_circle(fr, fc, p, i * DROP_SECONDS)
+                      for i, (fr, fc, p) in enumerate(falling))
+            + EMPTY_BOARD_SVG_SUFFIX)
 
 
-def animate_drop(container, game, col, player, delay=0.055):
+def render_svg(board, falling=()):
     """
-    Show a simple falling animation by redrawing the board with an overlay token
-    moving down the target column until the landing row.
-    We only modify the true board state at the end (by calling game.make_move).
+    Draw the board as an SVG like tkinter:
+    - blue rectangle with circular holes (white), from the prebuilt template
+    - tokens with black stroke
+    - falling=((row, col, player), ...) lists tokens already on the board
+      that are instead shown dropping into place, in order
     """
-    target_row = next_empty_row(game.board, col)
-    if target_row is None:
-        return False
+    if falling:
+        skip = {(fr, fc) for fr, fc, _ in falling}
+        return _render_falling(_render_static(board, skip), falling)
+    return _render_static(board) + EMPTY_BOARD_SVG_SUFFIX
+
+
+# st.cache_data rather than functools.lru_cache: Streamlit re-executes this
+# module on every rerun, which would start a fresh lru_cache each time
+@st.cache_data(max_entries=512)
+def _cached_svg(board_bytes, shape, dtype, falling):
+    """render_svg of a board given as raw bytes, cached across reruns"""
+    return render_svg(np.frombuffer(board_bytes, dtype=dtype).reshape(shape), falling)
+
+
+def board_svg(board, falling=()):
+    """render_svg keyed by the board's raw bytes and `falling`, so repeated frames hit the cache"""
+    return _cached_svg(board.tobytes(), board.shape, board.dtype.str, tuple(falling))
+
+
+# ------------------- CALLBACKS -------------------
+# Moves are committed in button callbacks, which Streamlit runs before the
+# rerun they trigger; that single run then shows the new pieces dropping
+# with SVG animation instead of redrawing from Python and rerunning again.
+def play_ai_move(game, ai, drops):
+    """Let the AI move and record the drop for the next render"""
+    # Reuse the last answer when the AI is asked about the same position again
+    key = game.state_key()
+    last = st.session_state.get("last_ai")
+    if last is not None and last[0] == key:
+        col = last[1]
+    else:
+        col = ai.get_best_move()
+        st.session_state.last_ai = (key, col)
+    if game.make_move(col, ai.AI):
+        drops.append((game.last_r, game.last_c, ai.AI))
 
-    # Start above the board (visual nicely)
-    for r in range(0, target_row + 1):
-        svg = render_svg(game.board, falling=(r, col, player))
-        container.markdown(svg, unsafe_allow_html=True)
-        time.sleep(delay)
 
-    # Commit the real move
-    game.make_move(col, player)
-    container.markdown(render_svg(game.board), unsafe_allow_html=True)
-    return True
+def restart_game():
+    """Start a fresh game; the AI opens when the "AI starts" toggle is on"""
+    st.session_state.game = ConnectFour()
+    st.session_state.ai.reset(st.session_state.game)
+    drops = []
+    if st.session_state.ai_starts:
+        st.session_state.ai.set_player_number(1)
+        # AI opening move
+        play_ai_move(st.session_state.game, st.session_state.ai, drops)
+    else:
+        st.session_state.ai.set_player_number(2)
+    st.session_state.drops = drops
+
+
+def drop_piece(col):
+    """Human move, followed by the AI reply if the game is still running"""
+    game, ai = st.session_state.game, st.session_state.ai
+    human = ai.AI ^ 3
+    drops = []
+    if game.make_move(col, human):
+        drops.append((game.last_r, col, human))
+        if game.check_winner(last=(game.last_r, game.last_c)) is None and not game.is_board_full():
+            play_ai_move(game, ai, drops)
+    st.session_state.drops = drops
 
 
 # ------------------- SESSION -------------------
@@ -131,34 +210,24 @@ st.title("Connect Four")
 # Controls
 c1, c2, c3 = st.columns([1, 1, 2])
 with c1:
-    ai_starts = st.toggle("AI starts", value=False)
+    st.toggle("AI starts", value=False, key="ai_starts")
 with c2:
-    if st.button("Restart Game", help="Start a fresh game", use_container_width=True):
-        st.session_state.game = ConnectFour()
-        st.session_state.ai = ConnectFourAI(st.session_state.game)
-        if ai_starts:
-            st.session_state.ai.set_player_number(1)
-            # AI opening move with animation
-            board_placeholder = st.empty()
-            board_placeholder.markdown(
-                render_svg(st.session_state.game.board), unsafe_allow_html=True
-            )
-            ai_col = st.session_state.ai.get_best_move()
-            animate_drop(board_placeholder, st.session_state.game, ai_col, 1)
-        else:
-            st.session_state.ai.set_player_number(2)
-        st.rerun()
+    st.button("Restart Game", help="Start a fresh game", use_container_width=True,
+              on_click=restart_game)
 
-# Whose turn
+# Game state for this run
 winner = g.check_winner()
-if winner is None and not g.is_board_full():
-    human = 1 if ai.AI == 2 else 2
+full = g.is_board_full()
+game_over = winner is not None or full
+
+# Whose turn
+if not game_over:
+    human = ai.AI ^ 3
     turn = "🔴 Human" if g.current_player == human else "🟡 AI"
     st.write(f"**Turn:** {turn}")
 
-# Board placeholder (used for animation)
-board_area = st.empty()
-board_area.markdown(render_svg(g.board), unsafe_allow_html=True)
+# Board, with the pieces dropped since the last run falling into place
+st.markdown(board_svg(g.board, st.session_state.pop("drops", ())), unsafe_allow_html=True)
 
 st.divider()
 st.write("Drop a piece:")
@@ -171,21 +240,14 @@ if winner is not None:
         st.balloons()
     else:
         st.error("AI wins! 🤖")
-elif g.is_board_full():
+elif full:
     st.info("It’s a tie.")
 else:
     for c in range(g.COLS):
         with drop[c]:
             disabled = not g.is_valid_move(c)
-            if st.button(f"↓ {c+1}", key=f"drop-{c}", disabled=disabled):
-                # Human move with falling animation
-                human = 1 if ai.AI == 2 else 2
-                if animate_drop(board_area, g, c, human):
-                    # If game still running, animate AI reply
-                    if g.check_winner() is None and not g.is_board_full():
-                        ai_col = ai.get_best_move()
-                        animate_drop(board_area, g, ai_col, ai.AI)
-                st.rerun()
+            st.button(f"↓ {c+1}", key=f"drop-{c}", disabled=disabled,
+                      on_click=drop_piece, args=(c,))
 
 st.markdown(
     "<p class='legend'>Red = Human, Yellow = AI. Click a column to drop a piece.</p>",
@@ -1,35 +1,78 @@
 from typing import List, Tuple, Optional
 import numpy as np
+from _search_core import CELL_BITS, CELL_LINES, H, board_to_bitboards, legal_cols, wins
 
 class ConnectFour:
     """
     Main game logic class for Connect Four
     Handles the game board and basic game mechanics
+    Players are always 1 and 2, so the other player is `player ^ 3`
     """
+    # Game board dimensions
+    ROWS = 6
+    COLS = 7
+
     def __init__(self):
-        # Initialize game board dimensions
-        self.ROWS = 6
-        self.COLS = 7
-        # Create empty board using numpy (0 represents empty cell)
-        self.board = np.zeros((self.ROWS, self.COLS), dtype=int)
+        # One bitboard per player (bb[player-1]) and the next free bit of
+        # each column; the numpy board is only built when asked for
+        self.bb = [0, 0]
+        self.heights = [c * H for c in range(self.COLS)]
+        self._board = None
+        # check_winner result, recomputed only after the position changes
+        self._winner = None
+        self._winner_dirty = False
+        self._moves = 0
+        # Columns played, for undo_move, and the cell of the last piece dropped
+        self.history: List[int] = []
+        self.last_r = None
+        self.last_c = None
         # Track current player (1 for human, 2 for AI)
         self.current_player = 1
+
+    @property
+    def board(self) -> np.ndarray:
+        """
+        Read-only numpy view of the position (0 empty, 1/2 players),
+        rebuilt from the bitboards after the position changes
+        """
+        if self._board is None:
+            board = np.zeros((self.ROWS, self.COLS), dtype=np.uint8)
+            for p in (1, 2):
+                board[(CELL_BITS & np.uint64(self.bb[p - 1])) != 0] = p
+            board.flags.writeable = False
+            self._board = board
+        return self._board
+
+    @board.setter
+    def board(self, board: np.ndarray) -> None:
+        """Load a position from a numpy board whose pieces all rest on the bottom"""
+        board = np.asarray(board)
+        self.bb = board_to_bitboards(board)
+        filled = (board != 0).sum(axis=0)
+        self.heights = [c * H + int(filled[c]) for c in range(self.COLS)]
+        self._board = None
+        self._winner_dirty = True
+        self._moves = int(filled.sum())
+        self.history = []
+        self.last_r = self.last_c = None
         
     def is_valid_move(self, col: int) -> bool:
-        # Column must be in range and the top cell must be empty
-        return 0 <= col < self.COLS and self.board[0, col] == 0
+        # Column must be in range and its top cell empty
+        return 0 <= col < self.COLS and not (self.bb[0] | self.bb[1]) >> (col * H + self.ROWS - 1) & 1
+
+
+    def legal_moves(self) -> List[int]:
+        """Columns that can still take a piece, left to right"""
+        return legal_cols(self.bb[0] | self.bb[1])
 
-    
     def get_next_open_row(self, col: int) -> Optional[int]:
         """
         Find the next available row in the given column
         Returns row index or None if column is full
-        Searches from bottom to top due to gravity
+        Read off the column height, rows counting down from the top
         """
-        for row in range(self.ROWS-1, -1, -1):
-            if self.board[row][col] == 0:
-                return row
-        return None
+        filled = self.heights[col] - col * H
+        return self.ROWS - 1 - filled if filled < self.ROWS else None
     
     def make_move(self, col: int, player: int) -> bool:
         """
@@ -48,71 +91,102 @@ class ConnectFour:
         if not self.is_valid_move(col):
             return False
     
-        # Find next open row (from bottom)
-        for row in range(self.ROWS - 1, -1, -1):
-            if self.board[row, col] == 0:
-                self.board[row, col] = player
-                # Toggle turn
-                self.current_player = 2 if self.current_player == 1 else 1
-                return True
-    
-        return False
+        # Set the column's next free bit
+        self.last_r, self.last_c = self.get_next_open_row(col), col
+        self.history.append(col)
+        self.bb[player - 1] ^= 1 << self.heights[col]
+        self.heights[col] += 1
+        self._board = None
+        self._winner_dirty = True
+        self._moves += 1
+        # Toggle turn
+        self.current_player ^= 3
+        return True
+
+    def undo_move(self, col: Optional[int] = None) -> bool:
+        """
+        Take back the top piece of column `col`, by default the last move
+        Hands the turn back to the player who dropped it
+        Returns False if there is nothing to take back
+        """
+        if col is None:
+            if not self.history:
+                return False
+            col = self.history[-1]
+        if not 0 <= col < self.COLS or self.heights[col] == col * H:
+            return False
+
+        self.heights[col] -= 1
+        bit = 1 << self.heights[col]
+        player = 1 if self.bb[0] & bit else 2
+        self.bb[player - 1] ^= bit
+        self._board = None
+        self._winner_dirty = True
+        self._moves -= 1
+        # Drop the column from the history, normally its last entry
+        for i in range(len(self.history) - 1, -1, -1):
+            if self.history[i] == col:
+                del self.history[i]
+                break
+        if self.history:
+            prev = self.history[-1]
+            self.last_r = self.ROWS - (self.heights[prev] - prev * H)
+            self.last_c = prev
+        else:
+            self.last_r = self.last_c = None
+        self.current_player = player
+        return True
 
     
-    def check_winner(self) -> Optional[int]:
+    def check_winner(self, last: Optional[Tuple[int, int]] = None) -> Optional[int]:
         """
         Check if there's a winner on the board
         Returns player number (1 or 2) if there's a winner
         Returns None if no winner
-        Checks all possible winning combinations:
-        - Horizontal
-        - Vertical 
-        - Both diagonals
+        Checks all possible winning combinations on each bitboard with one
+        shift/AND pair per direction (vertical, horizontal, both diagonals)
+        If `last` gives the (row, col) of the move just made into a position
+        without a winner, only the lines through that cell are checked; a
+        `last` of (None, None), as after a reset, falls back to the full scan
         """
-        # Check horizontal
-        for row in range(self.ROWS):
-            for col in range(self.COLS-3):
-                if (self.board[row][col] != 0 and 
-                    self.board[row][col] == self.board[row][col+1] == 
-                    self.board[row][col+2] == self.board[row][col+3]):
-                    return self.board[row][col]
-        
-        # Check vertical
-        for row in range(self.ROWS-3):
-            for col in range(self.COLS):
-                if (self.board[row][col] != 0 and 
-                    self.board[row][col] == self.board[row+1][col] == 
-                    self.board[row+2][col] == self.board[row+3][col]):
-                    return self.board[row][col]
-        
-        # Check diagonal (positive slope)
-        for row in range(self.ROWS-3):
-            for col in range(self.COLS-3):
-                if (self.board[row][col] != 0 and 
-                    self.board[row][col] == self.board[row+1][col+1] == 
-                    self.board[row+2][col+2] == self.board[row+3][col+3]):
-                    return self.board[row][col]
-        
-        # Check diagonal (negative slope)
-        for row in range(3, self.ROWS):
-            for col in range(self.COLS-3):
-                if (self.board[row][col] != 0 and 
-                    self.board[row][col] == self.board[row-1][col+1] == 
-                    self.board[row-2][col+2] == self.board[row-3][col+3]):
-                    return self.board[row][col]
-        
-        return None
+        if self._winner_dirty:
+            self._winner = None
+            if last is not None and None not in last:
+                r, c = last
+                p = 1 if self.bb[0] & int(CELL_BITS[r, c]) else 2
+                bb = self.bb[p - 1]
+                if any((bb & line) == line for line in CELL_LINES[r][c]):
+                    self._winner = p
+            else:
+                for p in (1, 2):
+                    if wins(self.bb[p - 1]):
+                        self._winner = p
+                        break
+            self._winner_dirty = False
+        return self._winner
     
     def is_board_full(self) -> bool:
         """
         Check if the game board is completely full
         Returns True if no more moves are possible
         """
-        return not any(self.board[0][col] == 0 for col in range(self.COLS))
+        return self._moves >= self.ROWS * self.COLS
     
     def get_current_player(self) -> int:
         return self.current_player
 
+    def state_key(self) -> Tuple[int, int, int]:
+        """Hashable key of the position and the player to move"""
+        return (self.bb[0], self.bb[1], self.current_player)
+
     def reset(self, starting_player: int = 1) -> None:
-        self.board[:, :] = 0
+        self.bb = [0, 0]
+        self.heights = [c * H for c in range(self.COLS)]
+        self._board = None
+        self._winner = None
+        self._winner_dirty = False
+        self._moves = 0
+        self.history = []
+        self.last_r = None
+        self.last_c = None
         self.current_player = starting_player
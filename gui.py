@@ -9,6 +9,9 @@ class ConnectFourGUI:
     Graphical user interface for Connect Four game
     Uses tkinter for rendering and handling user input
     """
+    # Piece color by board value: empty, human (1), AI (2)
+    PIECE_COLORS = ('white', 'red', 'yellow')
+
     def __init__(self):
         # Initialize main window
         self.window = tk.Tk()
@@ -18,6 +21,7 @@ class ConnectFourGUI:
         
         # Add tracking for last move
         self.last_move = None  # Will store (row, col) of last move
+        self.last_hover_col = None  # Column the hover piece is shown over
         
         # Set up display constants
         self.CELL_SIZE = 60  # Size of each cell in pixels
@@ -32,6 +36,9 @@ class ConnectFourGUI:
         )
         self.canvas.pack(pady=20)
         
+        # Create the canvas items once; redraws only recolor them
+        self.create_cells()
+        
         # Initialize board and bind events
         self.draw_board()
         self.canvas.bind('<Motion>', self.on_hover)  # Mouse movement
@@ -70,46 +77,78 @@ class ConnectFourGUI:
         # Add flag to track if AI is thinking
         self.ai_thinking = False
     
-    def draw_board(self):
+    def create_cells(self):
         """
-        Draw the game board and pieces
-        Creates circles for each cell and highlights last move
+        Create the last-move highlight and one oval per cell
+        Item ids are kept so draw_board can recolor them in place
         """
-        self.canvas.delete("all")  # Clear the canvas
+        # Highlight sits under the pieces and is hidden until needed
+        self.highlight = self.canvas.create_oval(
+            0, 0, 0, 0,
+            fill='lightblue',
+            outline='blue',
+            width=2,
+            state='hidden'
+        )
+        self.cells = []
+        self.cell_colors = []
         for row in range(self.game.ROWS):
+            self.cells.append([])
+            self.cell_colors.append([])
             for col in range(self.game.COLS):
                 x = col * self.CELL_SIZE + self.CELL_SIZE//2
                 y = row * self.CELL_SIZE + self.CELL_SIZE//2
-                
-                # Determine cell color based on occupant
-                color = 'white'  # Empty cell
-                if self.game.board[row][col] == 1:
-                    color = 'red'  # Human piece
-                elif self.game.board[row][col] == 2:
-                    color = 'yellow'  # AI piece
-                
-                # Draw highlight for last move
-                if self.last_move and (row, col) == self.last_move:
-                    # Draw highlight circle
-                    self.canvas.create_oval(
-                        x - self.RADIUS - 3,
-                        y - self.RADIUS - 3,
-                        x + self.RADIUS + 3,
-                        y + self.RADIUS + 3,
-                        fill='lightblue',
-                        outline='blue',
-                        width=2
-                    )
-                
-                # Draw the piece
-                self.canvas.create_oval(
+                self.cells[row].append(self.canvas.create_oval(
                     x - self.RADIUS,
                     y - self.RADIUS,
                     x + self.RADIUS,
                     y + self.RADIUS,
-                    fill=color,
+                    fill='white',
                     outline='black'
-                )
+                ))
+                self.cell_colors[row].append('white')
+        
+        # Hover piece, drawn last so it stays on top
+        self.hover = self.canvas.create_oval(
+            0, 0, 0, 0,
+            fill='red',
+            outline='black',
+            state='hidden'
+        )
+    
+    def draw_board(self):
+        """
+        Draw the game board and pieces
+        Recolors the cells that changed and highlights last move
+        """
+        self.hide_hover()
+        board = self.game.board.tolist()  # plain ints, cheaper to index
+        # Bind what the loop uses to locals, saving attribute lookups per cell
+        itemconfig = self.canvas.itemconfig
+        piece_colors = self.PIECE_COLORS
+        for values, items, colors in zip(board, self.cells, self.cell_colors):
+            for col, value in enumerate(values):
+                # Cell color by occupant: empty, human piece, AI piece
+                color = piece_colors[value]
+                if color != colors[col]:
+                    itemconfig(items[col], fill=color)
+                    colors[col] = color
+        
+        # Move the highlight to the last move
+        if self.last_move:
+            row, col = self.last_move
+            x = col * self.CELL_SIZE + self.CELL_SIZE//2
+            y = row * self.CELL_SIZE + self.CELL_SIZE//2
+            self.canvas.coords(
+                self.highlight,
+                x - self.RADIUS - 3,
+                y - self.RADIUS - 3,
+                x + self.RADIUS + 3,
+                y + self.RADIUS + 3
+            )
+            self.canvas.itemconfig(self.highlight, state='normal')
+        else:
+            self.canvas.itemconfig(self.highlight, state='hidden')
     
     def on_hover(self, event):
         """
@@ -122,20 +161,32 @@ class ConnectFourGUI:
             return
             
         col = event.x // self.CELL_SIZE
-        self.canvas.delete("hover")
+        # Nothing to redraw until the mouse crosses into another column
+        if col == self.last_hover_col:
+            return
+        self.last_hover_col = col
         
         if 0 <= col < self.game.COLS and self.game.is_valid_move(col):
             x = col * self.CELL_SIZE + self.CELL_SIZE//2
             # Always show red hover for human player
-            self.canvas.create_oval(
+            self.canvas.coords(
+                self.hover,
                 x - self.RADIUS,
                 self.RADIUS,
                 x + self.RADIUS,
-                self.RADIUS * 3,
-                fill='red',
-                outline='black',
-                tags="hover"
+                self.RADIUS * 3
             )
+            self.canvas.itemconfig(self.hover, state='normal')
+        else:
+            self.canvas.itemconfig(self.hover, state='hidden')
+    
+    def hide_hover(self):
+        """
+        Hide the hover piece
+        The next mouse movement shows it again, even in the same column
+        """
+        self.canvas.itemconfig(self.hover, state='hidden')
+        self.last_hover_col = None
     
     def on_click(self, event):
         """
@@ -156,39 +207,21 @@ class ConnectFourGUI:
         Execute a move in the given column
         Updates display and triggers AI response
         """
-        # Human is always red (1), AI is always yellow (2)
-        if self.player_choice.get() == "human":
-            # Human starts - use red (1)
-            if self.game.make_move(col, 1):
-                self.draw_board()
-                self.window.update()
-                
-                if self.check_game_end():
-                    return
-                
-                # Set thinking flag and disable hover effect
-                self.ai_thinking = True
-                self.canvas.delete("hover")
-                self.window.update()
-                
-                # Schedule AI move
-                self.window.after(100, self.ai_move)
-        else:
-            # AI starts - human still uses red (1)
-            if self.game.make_move(col, 1):
-                self.draw_board()
-                self.window.update()
-                
-                if self.check_game_end():
-                    return
-                
-                # Set thinking flag and disable hover effect
-                self.ai_thinking = True
-                self.canvas.delete("hover")
-                self.window.update()
-                
-                # Schedule AI move
-                self.window.after(100, self.ai_move)
+        # Human is always red (1), AI is always yellow (2), whoever started
+        if self.game.make_move(col, 1):
+            # Paint the new piece before the game-end dialog or AI search
+            self.draw_board()
+            self.window.update_idletasks()
+            
+            if self.check_game_end():
+                return
+            
+            # Set thinking flag and disable hover effect
+            self.ai_thinking = True
+            self.hide_hover()
+            
+            # Schedule AI move; this returns to the mainloop until it runs
+            self.window.after(100, self.ai_move)
     
     def ai_move(self):
         """
@@ -211,7 +244,7 @@ class ConnectFourGUI:
         Shows appropriate message and restarts if game is over
         Returns True if game is over, False otherwise
         """
-        winner = self.game.check_winner()
+        winner = self.game.check_winner(last=(self.game.last_r, self.game.last_c))
         if winner is not None:
             # Show winner message
             message = "You win!" if winner == 1 else "AI wins!"
@@ -230,7 +263,7 @@ class ConnectFourGUI:
         Reset the game to initial state
         """
         self.game = ConnectFour()
-        self.ai = ConnectFourAI(self.game)
+        self.ai.reset(self.game)
         self.ai.set_player_number(2)
         self.last_move = None  # Reset last move
         self.draw_board()
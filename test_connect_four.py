@@ -1,12 +1,20 @@
 import unittest
 import numpy as np
 from game import ConnectFour
-from ai import ConnectFourAI
+from ai import ConnectFourAI, INF
 
 class TestConnectFour(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One game and AI for the whole class; the AI's tables are built once
+        cls.game = ConnectFour()
+        cls.ai = ConnectFourAI(cls.game)
+
     def setUp(self):
-        self.game = ConnectFour()
-        self.ai = ConnectFourAI(self.game)
+        self.game.reset()
+        self.ai.reset(self.game)
+        # reset keeps the transposition table; tests must not share results
+        self.ai.tt.clear()
 
     def test_winning_move_detection(self):
         """Test if AI can detect and make any winning move"""
@@ -19,8 +27,9 @@ class TestConnectFour(unittest.TestCase):
             [0, 0, 0, 0, 0, 0, 0],
             [0, 2, 2, 2, 0, 0, 0]
         ])
+        self.game.current_player = 2  # AI to move
         move = self.ai.get_best_move()
-        self.game.make_move(move, 2)
+        self.assertTrue(self.game.make_move(move, 2))
         self.assertIsNotNone(self.game.check_winner())
 
     def test_blocking_priority(self):
@@ -54,20 +63,116 @@ class TestConnectFour(unittest.TestCase):
             [0, 1, 2, 0, 0, 0, 0],
             [1, 2, 1, 0, 0, 0, 0]
         ])
+        self.game.current_player = 2  # AI to move
         move = self.ai.get_best_move()
         # AI should make a defensive move to prevent fork
-        self.game.make_move(move, 2)
+        self.assertTrue(self.game.make_move(move, 2))
         # Check that opponent can't win in one move
-        for col in range(7):
-            if self.game.is_valid_move(col):
-                board_copy = self.game.board.copy()
-                row = self.game.get_next_open_row(col)
-                board_copy[row][col] = 1
-                self.assertIsNone(self.game.check_winner())
+        for col in self.game.legal_moves():
+            self.assertTrue(self.game.make_move(col, 1))
+            self.assertIsNone(self.game.check_winner())
+            self.game.undo_move()
+
+    def test_undo_move(self):
+        """Test that undo_move restores the board and the turn"""
+        before = self.game.board.copy()
+        self.assertTrue(self.game.make_move(3, 1))
+        self.assertTrue(self.game.undo_move(3))
+        np.testing.assert_array_equal(self.game.board, before)
+        self.assertEqual(self.game.get_current_player(), 1)
+        self.assertEqual(self.game.get_next_open_row(3), 5)
+        self.assertFalse(self.game.undo_move(3))
+        self.assertFalse(self.game.undo_move())
+
+    def test_check_winner_last_move(self):
+        """Test that checking only the last move agrees with the full scan"""
+        import random
+        rng = random.Random(0)
+        for _ in range(50):
+            self.game.reset()
+            self.assertIsNone(self.game.check_winner(last=(self.game.last_r, self.game.last_c)))
+            while self.game.legal_moves():
+                self.game.make_move(rng.choice(self.game.legal_moves()), self.game.current_player)
+                fast = self.game.check_winner(last=(self.game.last_r, self.game.last_c))
+                full = ConnectFour()
+                full.board = self.game.board
+                self.assertEqual(fast, full.check_winner())
+                if fast is not None:
+                    break
+        # No last move after loading a board or undoing every move
+        self.game.board = np.zeros((6, 7))
+        self.assertIsNone(self.game.check_winner(last=(self.game.last_r, self.game.last_c)))
+        self.game.make_move(3, 1)
+        self.game.undo_move()
+        self.assertIsNone(self.game.check_winner(last=(self.game.last_r, self.game.last_c)))
+
+    def test_board_helpers(self):
+        """Test that the AI's board helpers read the board they are given"""
+        for _ in range(3):
+            self.game.make_move(3, 1)
+            self.game.make_move(3, 2)
+        self.assertEqual(self.ai.get_valid_locations(self.game.board), self.game.legal_moves())
+        self.assertFalse(self.ai.is_terminal_node(self.game.board))
+        self.assertFalse(self.ai.allows_opponent_win(self.game.board, 1))
+        # Red on the bottom of columns 0, 1 and 3 wins in column 2
+        for col in (0, 1):
+            self.game.make_move(col, 1)
+            self.game.make_move(col, 2)
+        self.assertTrue(self.ai.allows_opponent_win(self.game.board, 1))
+
+    def test_minimax_board(self):
+        """Test that minimax searches the board it is given"""
+        board = create_test_scenario("early_game")
+        col, _ = self.ai.minimax(board, self.ai.MAX_DEPTH + 2, -float('inf'), float('inf'), True)
+        self.assertIn(col, self.ai.get_valid_locations(board))
+
+    def test_minimax_prefers_win_over_block(self):
+        """Test that the search takes its own win rather than blocking"""
+        board = np.array([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 2],
+            [0, 0, 0, 0, 0, 0, 2],
+            [0, 0, 0, 0, 0, 0, 2],
+            [1, 1, 1, 0, 0, 0, 1]
+        ])
+        col, value = self.ai.minimax(board, 4, -float('inf'), float('inf'), True)
+        self.assertEqual(col, 6)
+        self.assertEqual(value, INF)
+
+    def test_future_threats(self):
+        """Test the two-move threat score on a playable diagonal setup"""
+        self.game.board = np.array([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [2, 0, 0, 0, 0, 0, 0],
+            [2, 2, 1, 0, 0, 0, 0],
+            [2, 2, 2, 1, 0, 0, 0]
+        ])
+        # Two red pieces on a diagonal whose empty cells can both be played
+        self.assertEqual(self.ai._evaluate_future_threats(self.game.board, 1, 2), 5000)
+
+    def test_fork_detection(self):
+        """Test that a move leaving two winning columns scores as a fork"""
+        self.game.board = np.array([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 2, 2, 0, 0, 0, 0],
+            [0, 1, 1, 0, 0, 0, 0]
+        ])
+        # Red in column 3 threatens both column 0 and column 4
+        self.assertEqual(self.ai._evaluate_future_threats(self.game.board, 1, 2), 100000)
+        self.assertEqual(self.ai._evaluate_future_threats(self.game.board, 2, 1), 0)
 
     def test_performance(self):
         """Test AI decision time"""
         import time
+        # A mid-game position, so the search actually runs
+        self.game.board = create_test_scenario("mid_game_threat")
+        self.game.current_player = 2
         start_time = time.time()
         self.ai.get_best_move()
         end_time = time.time()